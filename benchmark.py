@@ -0,0 +1,82 @@
+"""
+Benchmark API latency and display cycle time for the single-process and
+multiprocess pipelines.
+
+Runs the ticker for a fixed time with a short update interval to keep the
+fetch/render path busy, while a client thread polls the /current endpoint.
+
+Usage:
+    python benchmark.py --mode single --duration 120
+    python benchmark.py --mode multiprocess --duration 120
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from threading import Thread, Event
+import requests
+import config
+import main
+
+def poll_api(latencies: list, stop: Event, interval: float):
+    """Poll the API until stopped, recording request latencies in seconds"""
+    url = f"http://127.0.0.1:{config.API_PORT}/current"
+    session = requests.Session()
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        try:
+            session.get(url, timeout=10).raise_for_status()
+            latencies.append(time.perf_counter() - started_at)
+        except requests.RequestException:
+            pass  # API not up yet
+        stop.wait(interval)
+
+def describe(name: str, values: list) -> str:
+    """Format count, p50, p95 and max of a list of durations in milliseconds"""
+    if len(values) < 2:
+        return f"{name}: not enough samples ({len(values)})"
+    ms = sorted(v * 1000 for v in values)
+    p50 = statistics.median(ms)
+    p95 = statistics.quantiles(ms, n=20)[-1]
+    return f"{name}: n={len(ms)} p50={p50:.1f}ms p95={p95:.1f}ms max={ms[-1]:.1f}ms"
+
+async def run(mode: str, duration: float):
+    """Run the display loop in the given mode for duration seconds"""
+    stock_display = main.StockDisplay()
+    if mode == "multiprocess":
+        from pipeline import Pipeline
+        from api import current_symbol
+        pipeline = Pipeline(current_symbol)
+        pipeline.start()
+        display_loop = stock_display.pipeline_loop(pipeline)
+    else:
+        display_loop = stock_display.display_loop()
+
+    Thread(target=main.run_api, daemon=True).start()
+    latencies = []
+    stop = Event()
+    Thread(target=poll_api, args=(latencies, stop, 0.05), daemon=True).start()
+
+    # Stop after the requested duration; the loops check running each cycle
+    asyncio.get_running_loop().call_later(duration, setattr, stock_display, "running", False)
+    await display_loop
+    stop.set()
+    return list(stock_display.cycle_times), latencies
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark the ticker process topologies")
+    parser.add_argument("--mode", choices=["single", "multiprocess"], default=config.PIPELINE_MODE)
+    parser.add_argument("--duration", type=float, default=120, help="Seconds to run")
+    parser.add_argument("--interval", type=float, default=0.5, help="Price update interval under load")
+    args = parser.parse_args()
+
+    config.PIPELINE_MODE = args.mode
+    config.PRICE_UPDATE_INTERVAL = args.interval
+    cycle_times, latencies = asyncio.run(run(args.mode, args.duration))
+
+    print(f"Mode: {args.mode}, duration: {args.duration:.0f}s, update interval: {args.interval}s")
+    print(describe("Cycle time", cycle_times))
+    print(describe("API latency", latencies))
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,83 @@
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    A circuit breaker for the upstream price feed.
+    After enough consecutive failures the circuit opens and calls are rejected
+    until a jittered, exponentially growing backoff has elapsed. A single
+    half-open probe is then let through: success closes the circuit, failure
+    re-opens it with a longer backoff.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, base_delay=30, max_delay=900, jitter=0.2):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_count = 0  # Consecutive trips, drives the backoff exponent
+        self.next_probe = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """True while the upstream is considered down (open or probing)"""
+        return self.state != self.CLOSED
+
+    def seconds_until_probe(self) -> float:
+        """Seconds left until the next half-open probe is allowed"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.next_probe - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go upstream right now"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() >= self.next_probe:
+            self.state = self.HALF_OPEN
+            logger.info("Circuit half-open, probing upstream")
+            return True
+        # Either still backing off or a probe is already in flight
+        return False
+
+    def reset(self):
+        """Close the circuit and forget past failures"""
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_count = 0
+
+    def record_success(self):
+        """Record a successful call and close the circuit"""
+        if self.state != self.CLOSED:
+            logger.info("Upstream probe succeeded, circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_count = 0
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit when the threshold is hit"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self):
+        """Open the circuit and schedule the next probe"""
+        self.open_count += 1
+        delay = self.base_delay * 2 ** (self.open_count - 1)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        delay = min(self.max_delay, delay)  # Jitter first so the cap holds
+        self.state = self.OPEN
+        self.next_probe = time.monotonic() + delay
+        logger.warning(f"Circuit open after {self.failures} failures, next probe in {delay:.0f}s")
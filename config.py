@@ -15,3 +15,29 @@ API_PORT = 8080
 
 # Display orientation
 ROTATE_DISPLAY = 0  # 0, 90, 180, or 270 degrees
+
+# Circuit breaker for upstream (Wi-Fi / Yahoo) outages
+BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failures before going offline
+BREAKER_BASE_DELAY = 30  # First backoff before probing again (seconds)
+BREAKER_MAX_DELAY = 900  # Backoff cap (seconds)
+BREAKER_JITTER = 0.2  # +/- fraction of random jitter applied to each backoff
+
+# E-Paper refresh policy
+REFRESH_MAX_BETWEEN_FULL = 30  # Partial/fast refreshes allowed before a full refresh clears ghosting
+REFRESH_PARTIAL_MAX_CHANGE = 0.10  # Max fraction of changed pixels for a partial refresh
+
+# Process topology: "single" runs everything in one process, "multiprocess"
+# moves fetching and rendering into worker processes (see pipeline.py)
+PIPELINE_MODE = "single"
+PIPELINE_MAX_BARS = 1440  # One day of 1-minute bars kept in shared memory
+
+# Intraday indicators (windows in 1-minute bars)
+MA_SHORT_WINDOW = 5
+MA_LONG_WINDOW = 20
+PREVIOUS_CLOSE_RETRY = 60  # First retry delay after a failed previous close lookup (seconds)
+PREVIOUS_CLOSE_MAX_RETRY = 1800  # Retry delay cap (seconds)
+
+# Record everything DataFetcher returns for replay/soak tests (see replay.py
+# and soak.py). Each run writes its own file named after this one, e.g.
+# recording-20261019-120000-1234.jsonl.gz. None to disable
+RECORD_FILE = None
@@ -2,7 +2,12 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
+import time
 from dataclasses import dataclass
+from typing import Optional
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from indicators import IndicatorEngine
+import config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,14 +17,66 @@ class StockStats:
     current_price: float
     day_high: float
     day_low: float
+    change_pct: Optional[float] = None  # % change vs previous close
+    vwap: Optional[float] = None
+    ma_short: Optional[float] = None
+    ma_long: Optional[float] = None
 
 class DataFetcher:
     def __init__(self):
         self.cache = {}
         self.cache_timestamp = {}
+        self.history_cache = {}
+        self.symbol = None  # Last symbol quoted, a change resets the breaker
+        self.indicators = {}  # symbol -> IndicatorEngine
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+            base_delay=config.BREAKER_BASE_DELAY,
+            max_delay=config.BREAKER_MAX_DELAY,
+            jitter=config.BREAKER_JITTER
+        )
+
+    @property
+    def offline(self) -> bool:
+        """True while the circuit breaker considers the upstream down"""
+        return self.breaker.is_open
+
+    def last_updated(self, symbol: str) -> Optional[datetime]:
+        """Time of the last successful quote fetch for the given symbol"""
+        return self.cache_timestamp.get(symbol)
+
+    def _download(self, symbol: str, interval: str = '1m', secondary: bool = False, **kwargs) -> pd.DataFrame:
+        """Download bars through the circuit breaker.
+
+        Secondary lookups are skipped while offline but never take the half-open
+        probe or count toward the breaker, so they can't push the quote path offline.
+        """
+        if secondary:
+            if self.breaker.is_open:
+                raise CircuitOpenError(f"Upstream offline, skipping fetch for {symbol}")
+        elif not self.breaker.allow_request():
+            raise CircuitOpenError(f"Upstream offline, skipping fetch for {symbol}")
+        try:
+            df = yf.download(symbol, interval=interval, progress=False, **kwargs)
+            if df.empty:
+                # yfinance swallows network errors and returns an empty frame
+                raise ValueError(f"No data available for {symbol}")
+        except Exception:
+            if not secondary:
+                self.breaker.record_failure()
+            raise
+        if not secondary:
+            self.breaker.record_success()
+        return df
 
     def get_stock_data(self, symbol: str) -> StockStats:
         """Fetch current price and daily stats for the given symbol."""
+        if symbol != self.symbol:
+            # Failures may have come from a bad symbol rather than an outage
+            if self.breaker.is_open:
+                logger.info(f"Symbol changed to {symbol}, resetting circuit breaker")
+            self.breaker.reset()
+            self.symbol = symbol
         try:
             # Try to get data from cache first
             if symbol in self.cache and (datetime.now() - self.cache_timestamp.get(symbol, datetime.min)).seconds < 60:
@@ -31,18 +88,18 @@ class DataFetcher:
             if is_crypto:
                 # Get data since midnight of current day
                 today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                df = yf.download(symbol, start=today, interval='1m', progress=False)
+                df = self._download(symbol, start=today)
             else:
                 # For stocks, use regular 1d period
-                df = yf.download(symbol, period='1d', interval='1m', progress=False)
+                df = self._download(symbol, period='1d')
 
-            if df.empty:
-                raise ValueError(f"No data available for {symbol}")
-            
+            current_price = float(df['Close'].iloc[-1])
+            indicators = self._update_indicators(symbol, df)
             stats = StockStats(
-                current_price=float(df['Close'].iloc[-1]),
+                current_price=current_price,
                 day_high=float(df['High'].max()),
-                day_low=float(df['Low'].min())
+                day_low=float(df['Low'].min()),
+                **indicators.values(current_price)
             )
             
             # Update cache
@@ -51,23 +108,56 @@ class DataFetcher:
             
             return stats
         except Exception as e:
-            logger.error(f"Error fetching data for {symbol}: {str(e)}")
+            if not isinstance(e, CircuitOpenError):
+                logger.error(f"Error fetching data for {symbol}: {str(e)}")
             # If we have cached data, return it as fallback
             if symbol in self.cache:
                 logger.info(f"Using cached data for {symbol}")
                 return self.cache[symbol]
             raise
 
+    def _update_indicators(self, symbol: str, df: pd.DataFrame) -> IndicatorEngine:
+        """Feed new bars to the symbol's indicator engine."""
+        engine = self.indicators.get(symbol)
+        if engine is None:
+            engine = IndicatorEngine(config.MA_SHORT_WINDOW, config.MA_LONG_WINDOW)
+            self.indicators[symbol] = engine
+        engine.ingest(df)
+
+        # Look the previous close up once per session, backing off after failures
+        session_date = df.index[-1].date()
+        if engine.previous_close_session != session_date and time.monotonic() >= engine.previous_close_retry_at:
+            try:
+                engine.previous_close = self.get_previous_close(symbol, session_date)
+                engine.previous_close_session = session_date
+                engine.previous_close_failures = 0
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):
+                    logger.error(f"Error fetching previous close for {symbol}: {str(e)}")
+                delay = min(config.PREVIOUS_CLOSE_MAX_RETRY, config.PREVIOUS_CLOSE_RETRY * 2 ** engine.previous_close_failures)
+                engine.previous_close_failures += 1
+                engine.previous_close_retry_at = time.monotonic() + delay
+        return engine
+
+    def get_previous_close(self, symbol: str, session_date) -> Optional[float]:
+        """Fetch the close of the last session before session_date, None if there is none."""
+        daily = self._download(symbol, interval='1d', secondary=True, period='5d')
+        previous = daily[daily.index.date < session_date]
+        if previous.empty:
+            return None
+        return float(previous['Close'].iloc[-1])
+
     def get_historical_data(self, symbol: str) -> pd.DataFrame:
         """Fetch last 24h of price data for the given symbol."""
         try:
             # Get 1-day data with 1-minute intervals
-            df = yf.download(symbol, period='1d', interval='1m', progress=False)
-            
-            if df.empty:
-                raise ValueError(f"No historical data available for {symbol}")
-            
-            return df[['Close']]
+            df = self._download(symbol, period='1d')
+            self.history_cache[symbol] = df[['Close']]
+            return self.history_cache[symbol]
         except Exception as e:
-            logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
+            if not isinstance(e, CircuitOpenError):
+                logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
+            if symbol in self.history_cache:
+                logger.info(f"Using cached historical data for {symbol}")
+                return self.history_cache[symbol]
             raise
@@ -1,8 +1,5 @@
 import logging
 import time
-from PIL import Image, ImageDraw, ImageFont
-import matplotlib.pyplot as plt
-import io
 import sys
 import os
 
@@ -15,11 +12,14 @@ import os
 sys.modules['waveshare_epd.epdconfig'] = sys.modules['epdconfig_override']
 
 from waveshare_epd import epd2in13_V4
+import config
+from refresh_policy import RefreshPolicy, FULL, FAST, PARTIAL, SKIP
+from renderer import StockRenderer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class EPaperDisplay:
+class EPaperDisplay(StockRenderer):
     """
     A class to handle the e-Paper display operations using the Waveshare library.
     This implementation follows the Waveshare example code structure more closely.
@@ -28,23 +28,17 @@ class EPaperDisplay:
         # Initialize the display
         self.epd = epd2in13_V4.EPD()
         
-        # The display dimensions (using natural orientation like example)
-        self.width = self.epd.height  # Match example code orientation
-        self.height = self.epd.width  # Match example code orientation
+        # The display dimensions (using natural orientation like example), image buffer and fonts
+        super().__init__(self.epd.height, self.epd.width)  # Match example code orientation
         logger.info(f"Display dimensions: {self.width}x{self.height}")
-        
-        # Create initial image buffer (255 for white background)
-        self.image = Image.new('1', (self.width, self.height), 255)
-        self.draw = ImageDraw.Draw(self.image)
-        
-        # Load fonts
-        try:
-            self.price_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-            self.symbol_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-        except OSError:
-            logger.warning("Custom fonts not found, using default font")
-            self.price_font = ImageFont.load_default()
-            self.symbol_font = ImageFont.load_default()
+
+        # Refresh policy state: the panel stays initialized between refreshes
+        self.policy = RefreshPolicy(
+            max_between_full=config.REFRESH_MAX_BETWEEN_FULL,
+            partial_max_change=config.REFRESH_PARTIAL_MAX_CHANGE
+        )
+        self.panel_mode = None  # Mode the controller is currently initialized for
+        self.last_frame = None  # Frame currently shown on the panel, None if unknown
 
         # Initialize the display after setting up image and draw objects
         self.init_display()
@@ -54,6 +48,7 @@ class EPaperDisplay:
         try:
             logger.info("Starting display initialization...")
             self.epd.init()  # V4 doesn't use FULL_UPDATE parameter
+            self.panel_mode = FULL
             logger.info("Display init complete, clearing display...")
             self.clear_display()  # Start with a clean display
             
@@ -72,7 +67,8 @@ class EPaperDisplay:
             self.epd.display(buffer)
             logger.info("Test pattern sent to display")
             
-            time.sleep(2)
+            # display() returns once BUSY is released; first real frame is a full refresh
+            self.last_frame = None
             logger.info("E-Paper display initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize display: {str(e)}")
@@ -83,82 +79,75 @@ class EPaperDisplay:
     def clear_display(self):
         """Clear the display to white"""
         try:
+            self._prepare_panel(FULL)
             self.epd.Clear(0xFF)  # 0xFF for white
+            self.last_frame = None
             logger.info("Display cleared")
         except Exception as e:
             logger.error(f"Failed to clear display: {str(e)}")
             raise
 
-    def create_stock_layout(self, symbol: str, stats, graph_data=None):
-        """Create the stock display layout"""
-        # Clear the image buffer
-        self.draw.rectangle((0, 0, self.width, self.height), fill=255)
-        
-        # Draw symbol at top left
-        self.draw.text((5, 5), symbol, font=self.symbol_font, fill=0)
-
-        # Draw current price below symbol
-        price_text = f"${stats.current_price:.2f}" if stats.current_price < 1000 else f"${stats.current_price:,.0f}"
-        self.draw.text((5, 30), price_text, font=self.price_font, fill=0)
-
-        # Draw high/low stats on top right
-        stats_x = self.width - 80
-        self.draw.text((stats_x, 5), f"H: ${stats.day_high:.2f}", font=self.symbol_font, fill=0)
-        self.draw.text((stats_x, 20), f"L: ${stats.day_low:.2f}", font=self.symbol_font, fill=0)
+    def _prepare_panel(self, mode):
+        """Initialize the controller for the given refresh mode, only when it changes"""
+        if mode == PARTIAL:
+            # displayPartial resets and configures the controller by itself
+            self.panel_mode = PARTIAL
+            return
+        if self.panel_mode == mode:
+            return
+        if mode == FAST:
+            self.epd.init_fast()
+        else:
+            self.epd.init()
+        self.panel_mode = mode
 
-        # Add graph if data is provided
-        if graph_data is not None:
-            graph_image = self._create_graph(graph_data)
-            self.image.paste(graph_image, (0, 60))
-
-    def _create_graph(self, data):
-        """Create a price history graph"""
-        # Create a new figure with the correct size for the display
-        graph_height = self.height - 60  # Leave space for text above
-        dpi = 100
-        fig_width = self.width / dpi
-        fig_height = graph_height / dpi
-        
-        plt.figure(figsize=(fig_width, fig_height), dpi=dpi)
-        plt.plot(data, color='black', linewidth=1)
-        plt.axis('off')  # Hide axes
-        
-        # Set margins to 0 to use full space
-        plt.margins(0)
-        plt.tight_layout(pad=0)
-        
-        # Convert plot to PIL Image
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        graph_image = Image.open(buf).convert('L')  # Convert to grayscale
-        
-        # Resize to fit the display
-        graph_image = graph_image.resize((self.width, graph_height))
-        
-        # Convert to black and white (1-bit)
-        graph_image = graph_image.point(lambda x: 0 if x < 128 else 255, '1')
-        
-        return graph_image
+    def _write_base_image(self, buffer):
+        """Write the frame to the controller's previous-image RAM without refreshing"""
+        # Partial refreshes diff against this RAM, display_fast only writes the new-image RAM
+        self.epd.send_command(0x26)
+        self.epd.send_data2(buffer)
 
     def update_display(self):
-        """Update the display with the current image buffer"""
+        """Update the display with the current image buffer using the refresh policy"""
         try:
-            logger.info(f"Display buffer size: {len(self.epd.getbuffer(self.image))} bytes")
-            self.epd.init()  # V4 doesn't use FULL_UPDATE parameter
-            self.epd.display(self.epd.getbuffer(self.image))
-            time.sleep(2)  # Give the display time to update
-            logger.info("Display updated successfully")
+            mode = self.policy.choose(self.last_frame, self.image)
+            if mode == SKIP:
+                self.policy.record(SKIP, 0.0)
+                logger.info("Display unchanged, skipping refresh")
+                return
+
+            buffer = self.epd.getbuffer(self.image)
+            self._prepare_panel(mode)
+            # The driver calls below block on the BUSY pin, so this times the refresh itself
+            start = time.monotonic()
+            if mode == FULL:
+                # Writes both RAMs so following partial refreshes have a base image
+                self.epd.displayPartBaseImage(buffer)
+            elif mode == FAST:
+                self.epd.display_fast(buffer)
+                self._write_base_image(buffer)
+            else:
+                self.epd.displayPartial(buffer)
+            duration = time.monotonic() - start
+
+            self.policy.record(mode, duration)
+            self.last_frame = self.image.copy()
+            logger.info(f"Display updated successfully ({mode} refresh, {duration:.2f}s)")
+            if mode == FULL:
+                logger.info(f"Refresh stats: {self.policy.summary()}")
         except Exception as e:
+            # Panel state is unknown after a failed refresh, start over with a full one
+            self.panel_mode = None
+            self.last_frame = None
             logger.error(f"Failed to update display: {str(e)}")
             raise
 
     def sleep(self):
         """Put the display to sleep"""
         try:
-            self.epd.init()  # V4 doesn't use FULL_UPDATE parameter
             self.epd.sleep()
+            self.panel_mode = None
+            self.last_frame = None
             logger.info("Display entered sleep mode")
         except Exception as e:
             logger.error(f"Failed to put display to sleep: {str(e)}")
@@ -0,0 +1,89 @@
+from collections import deque
+from typing import Optional
+import pandas as pd
+
+class RollingMean:
+    """Mean of the last `window` values, updated in O(1) with a ring buffer and running sum"""
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]  # Evicted by the append below
+        self.values.append(value)
+        self.total += value
+
+    @property
+    def value(self) -> Optional[float]:
+        """The mean once the window is full, None before that"""
+        if len(self.values) < self.window:
+            return None
+        return self.total / self.window
+
+class IndicatorEngine:
+    """
+    Intraday indicators for one symbol, updated incrementally from 1-minute bars.
+    Each new completed bar costs O(1): VWAP keeps running sums and the moving
+    averages keep ring buffers, so the day's frame is never recomputed.
+    """
+    def __init__(self, short_window: int, long_window: int):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.reset()
+
+    def reset(self):
+        """Start a new session"""
+        self.previous_close = None
+        self.previous_close_session = None  # Session date the previous close was looked up for
+        self.previous_close_failures = 0
+        self.previous_close_retry_at = 0.0  # time.monotonic() before which no lookup is retried
+        self.session_start = None
+        self.last_timestamp = None
+        self.pv_total = 0.0
+        self.volume_total = 0.0
+        self.ma_short = RollingMean(self.short_window)
+        self.ma_long = RollingMean(self.long_window)
+
+    def update(self, close: float, high: float, low: float, volume: float):
+        """Add one completed bar"""
+        typical_price = (high + low + close) / 3
+        self.pv_total += typical_price * volume
+        self.volume_total += volume
+        self.ma_short.push(close)
+        self.ma_long.push(close)
+
+    def ingest(self, bars: pd.DataFrame):
+        """Add the completed bars of the day frame that haven't been seen yet"""
+        if bars.empty:
+            return
+        if bars.index[0] != self.session_start:
+            # New session (or first call), the previous close has to be fetched again
+            self.reset()
+            self.session_start = bars.index[0]
+
+        completed = bars.iloc[:-1]  # The last bar is still forming
+        start = 0 if self.last_timestamp is None else completed.index.searchsorted(self.last_timestamp, side='right')
+        new_bars = completed.iloc[start:]
+        if new_bars.empty:
+            return
+        for close, high, low, volume in zip(new_bars['Close'].to_numpy(dtype=float),
+                                            new_bars['High'].to_numpy(dtype=float),
+                                            new_bars['Low'].to_numpy(dtype=float),
+                                            new_bars['Volume'].fillna(0).to_numpy(dtype=float)):
+            self.update(float(close), float(high), float(low), float(volume))
+        self.last_timestamp = new_bars.index[-1]
+
+    def values(self, current_price: float) -> dict:
+        """Indicator values for StockStats, None where not available yet"""
+        change_pct = None
+        if self.previous_close:
+            change_pct = (current_price - self.previous_close) / self.previous_close * 100
+        vwap = self.pv_total / self.volume_total if self.volume_total > 0 else None
+        return {
+            "change_pct": change_pct,
+            "vwap": vwap,
+            "ma_short": self.ma_short.value,
+            "ma_long": self.ma_long.value,
+        }
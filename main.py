@@ -2,12 +2,14 @@ import asyncio
 import logging
 import uvicorn
 from api import app
-from epaper_display import EPaperDisplay
 from mock_display import MockDisplay
 from data_fetcher import DataFetcher
+from replay import Recorder
 import config
 import signal
 import sys
+import time
+from collections import deque
 from threading import Thread
 from datetime import datetime, timedelta
 
@@ -15,18 +17,30 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class StockDisplay:
-    def __init__(self):
-        try:
-            self.display = EPaperDisplay()  # Use the new EPaperDisplay class
-            logger.info("Using e-Paper display")
-        except Exception as e:
-            logger.warning(f"Failed to initialize e-Paper display: {e}")
-            logger.info("Falling back to mock display. Check output directory for images.")
-            self.display = MockDisplay()
-        self.data_fetcher = DataFetcher()
+    def __init__(self, display=None, data_fetcher=None):
+        if display is not None:
+            self.display = display
+        else:
+            try:
+                # Imported here so a missing driver or pigpio daemon also falls back
+                from epaper_display import EPaperDisplay
+                self.display = EPaperDisplay()  # Use the new EPaperDisplay class
+                logger.info("Using e-Paper display")
+            except Exception as e:
+                logger.warning(f"Failed to initialize e-Paper display: {e}")
+                logger.info("Falling back to mock display. Check output directory for images.")
+                self.display = MockDisplay()
+        if data_fetcher is not None:
+            self.data_fetcher = data_fetcher
+        elif config.RECORD_FILE and config.PIPELINE_MODE != "multiprocess":
+            # In multiprocess mode the fetch worker does the recording
+            self.data_fetcher = Recorder(DataFetcher(), config.RECORD_FILE)
+        else:
+            self.data_fetcher = DataFetcher()
         self.running = True
         self.last_graph_update = datetime.min
         self.current_graph_data = None
+        self.cycle_times = deque(maxlen=1000)  # Seconds from fetch start to display update
         
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -52,22 +66,76 @@ class StockDisplay:
             now = datetime.now()
             if self.current_graph_data is None or (now - self.last_graph_update).total_seconds() >= config.GRAPH_UPDATE_INTERVAL:
                 self.current_graph_data = self.data_fetcher.get_historical_data(current_symbol)
-                self.last_graph_update = now
-                logger.info(f"Updated graph data for {current_symbol}")
+                if not self.data_fetcher.offline:
+                    self.last_graph_update = now
+                    logger.info(f"Updated graph data for {current_symbol}")
+            
+            # While offline the cached data is shown with a staleness indicator
+            stale_since = self.data_fetcher.last_updated(current_symbol) if self.data_fetcher.offline else None
             
             # Create layout and update display
-            self.display.create_stock_layout(current_symbol, stats, self.current_graph_data)
+            self.display.create_stock_layout(current_symbol, stats, self.current_graph_data, stale_since)
             self.display.update_display()  # Use new display update method
             
-            logger.info(f"Updated display with {current_symbol} price: {stats.current_price}")
+            if stale_since is not None:
+                logger.info(f"Offline, showing cached {current_symbol} price from {stale_since:%H:%M}")
+            else:
+                logger.info(f"Updated display with {current_symbol} price: {stats.current_price}")
         except Exception as e:
             logger.error(f"Error updating display: {str(e)}")
 
     async def display_loop(self):
         """Main loop for updating the display"""
         while self.running:
+            started_at = time.time()
             await self.update_price_display()
-            await asyncio.sleep(config.PRICE_UPDATE_INTERVAL)
+            self.cycle_times.append(time.time() - started_at)
+            if self.data_fetcher.offline:
+                # Stay idle until the circuit breaker allows the next probe
+                delay = max(self.data_fetcher.breaker.seconds_until_probe(), config.PRICE_UPDATE_INTERVAL)
+                logger.info(f"Upstream offline, next probe in {delay:.0f}s")
+                await self.wait_offline(delay)
+            else:
+                await asyncio.sleep(config.PRICE_UPDATE_INTERVAL)
+
+    async def wait_offline(self, delay: float):
+        """Sleep until the next probe, waking early when the symbol changes"""
+        from api import current_symbol as symbol
+        end = time.monotonic() + delay
+        while self.running and time.monotonic() < end:
+            await asyncio.sleep(min(config.PRICE_UPDATE_INTERVAL, end - time.monotonic()))
+            from api import current_symbol
+            if current_symbol != symbol:
+                logger.info(f"Symbol changed to {current_symbol}, leaving offline wait")
+                break
+
+    async def pipeline_loop(self, pipeline):
+        """Main loop when fetching and rendering run in worker processes"""
+        loop = asyncio.get_running_loop()
+        try:
+            while self.running:
+                from api import current_symbol
+                if current_symbol != pipeline.symbol:
+                    pipeline.set_symbol(current_symbol)
+
+                dead = pipeline.dead_workers()
+                if dead:
+                    # Workers can't be re-forked safely once the API thread runs,
+                    # exit and let the service manager restart everything
+                    raise RuntimeError(f"Pipeline worker(s) died: {', '.join(dead)}")
+
+                frame = await loop.run_in_executor(None, pipeline.next_frame, 0.5)
+                if frame is None:
+                    continue
+                image, started_at = frame
+                try:
+                    self.display.image.paste(image)
+                    await loop.run_in_executor(None, self.display.update_display)
+                    self.cycle_times.append(time.time() - started_at)
+                except Exception as e:
+                    logger.error(f"Error updating display: {str(e)}")
+        finally:
+            pipeline.close()
 
 def run_api():
     """Run the FastAPI server"""
@@ -77,12 +145,22 @@ async def main():
     """Main function to run both the display and API server"""
     stock_display = StockDisplay()
     
+    if config.PIPELINE_MODE == "multiprocess":
+        from pipeline import Pipeline
+        from api import current_symbol
+        # Fork the workers before the API thread starts
+        pipeline = Pipeline(current_symbol)
+        pipeline.start()
+        display_loop = stock_display.pipeline_loop(pipeline)
+    else:
+        display_loop = stock_display.display_loop()
+    
     # Start API server in a separate thread
     api_thread = Thread(target=run_api, daemon=True)
     api_thread.start()
     
     # Run display loop
-    await stock_display.display_loop()
+    await display_loop
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,234 @@
+import logging
+import multiprocessing as mp
+import queue
+import signal
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from PIL import Image
+import config
+from data_fetcher import DataFetcher, StockStats
+from renderer import StockRenderer
+from replay import Recorder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SharedBars:
+    """
+    Quote stats and close-price history kept in a shared memory block.
+    Layout (float64): bar count, current price, day high, day low, change %,
+    VWAP, short MA, long MA (NaN when unavailable), then max_bars timestamps
+    (epoch seconds) followed by max_bars closes.
+    """
+    HEADER = 8
+
+    def __init__(self, lock, max_bars=config.PIPELINE_MAX_BARS):
+        self.lock = lock
+        self.max_bars = max_bars
+        length = self.HEADER + 2 * max_bars
+        self.shm = shared_memory.SharedMemory(create=True, size=length * 8)
+        self.data = np.ndarray((length,), dtype=np.float64, buffer=self.shm.buf)
+        self.data[:] = 0.0
+
+    def write(self, stats: StockStats, history: pd.DataFrame):
+        """Store the latest stats and the most recent max_bars closes"""
+        closes = np.asarray(history['Close'], dtype=np.float64).ravel()[-self.max_bars:]
+        epoch = pd.Timestamp(0, tz=history.index.tz)
+        stamps = ((history.index - epoch) / pd.Timedelta(seconds=1)).to_numpy()[-self.max_bars:]
+        n = len(closes)
+        ts_start = self.HEADER
+        close_start = self.HEADER + self.max_bars
+        with self.lock:
+            self.data[:self.HEADER] = (
+                n, stats.current_price, stats.day_high, stats.day_low,
+                *(np.nan if v is None else v for v in (stats.change_pct, stats.vwap, stats.ma_short, stats.ma_long))
+            )
+            self.data[ts_start:ts_start + n] = stamps
+            self.data[close_start:close_start + n] = closes
+
+    def read(self):
+        """Return (StockStats, DataFrame) rebuilt from the shared block"""
+        ts_start = self.HEADER
+        close_start = self.HEADER + self.max_bars
+        with self.lock:
+            n = int(self.data[0])
+            stats = StockStats(*(None if np.isnan(v) else float(v) for v in self.data[1:self.HEADER]))
+            stamps = self.data[ts_start:ts_start + n].copy()
+            closes = self.data[close_start:close_start + n].copy()
+        history = pd.DataFrame({'Close': closes}, index=pd.to_datetime(stamps, unit='s'))
+        return stats, history
+
+    def close(self, unlink=False):
+        """Detach from the block, unlinking it when called by the owner"""
+        self.data = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+class SharedFrame:
+    """A packed 1-bit display frame kept in a shared memory block"""
+    def __init__(self, lock, width=config.DISPLAY_WIDTH, height=config.DISPLAY_HEIGHT):
+        self.lock = lock
+        self.size = (width, height)
+        self.length = (width + 7) // 8 * height  # PIL packs '1' images row by row
+        self.shm = shared_memory.SharedMemory(create=True, size=self.length)
+
+    def write(self, image: Image.Image):
+        """Pack the image into the shared block"""
+        packed = image.convert('1').tobytes()
+        with self.lock:
+            self.shm.buf[:self.length] = packed
+
+    def read(self) -> Image.Image:
+        """Unpack the shared block into a new image"""
+        with self.lock:
+            packed = bytes(self.shm.buf[:self.length])
+        return Image.frombytes('1', self.size, packed)
+
+    def close(self, unlink=False):
+        """Detach from the block, unlinking it when called by the owner"""
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def _worker_signals():
+    """Leave shutdown to the parent, which owns the display"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def fetch_worker(bars: SharedBars, control, bars_queue, symbol: str):
+    """Fetch quotes and history, publish them to shared memory and notify the renderer"""
+    _worker_signals()
+    fetcher = DataFetcher()
+    recorder = None
+    if config.RECORD_FILE:
+        recorder = fetcher = Recorder(fetcher, config.RECORD_FILE)
+    try:
+        history = None
+        last_graph_update = datetime.min
+        delay = 0
+        while True:
+            try:
+                msg = control.get(timeout=delay)
+            except queue.Empty:
+                msg = None
+            if msg is not None:
+                if msg[0] == "stop":
+                    bars_queue.put(("stop",))
+                    break
+                if msg[0] == "symbol":
+                    symbol = msg[1]
+                    history = None  # Fetch the new symbol's history right away
+
+            started_at = time.time()
+            try:
+                stats = fetcher.get_stock_data(symbol)
+                now = datetime.now()
+                if history is None or (now - last_graph_update).total_seconds() >= config.GRAPH_UPDATE_INTERVAL:
+                    history = fetcher.get_historical_data(symbol)
+                    if not fetcher.offline:
+                        last_graph_update = now
+                        logger.info(f"Updated graph data for {symbol}")
+                stale_since = fetcher.last_updated(symbol) if fetcher.offline else None
+                bars.write(stats, history)
+                bars_queue.put(("bars", symbol, stale_since, started_at))
+            except Exception as e:
+                logger.error(f"Error fetching data in worker: {str(e)}")
+
+            if fetcher.offline:
+                delay = max(fetcher.breaker.seconds_until_probe(), config.PRICE_UPDATE_INTERVAL)
+            else:
+                delay = config.PRICE_UPDATE_INTERVAL
+    finally:
+        # Workers exit via os._exit, so the recording has to be closed explicitly
+        if recorder is not None:
+            recorder.close()
+        bars.close()
+
+def render_worker(bars: SharedBars, frame: SharedFrame, bars_queue, frames_queue):
+    """Render the layout for each bar update and publish the packed frame"""
+    _worker_signals()
+    renderer = StockRenderer(frame.size[0], frame.size[1])
+    while True:
+        msg = bars_queue.get()
+        # Skip to the newest update if rendering fell behind
+        while msg[0] == "bars":
+            try:
+                msg = bars_queue.get_nowait()
+            except queue.Empty:
+                break
+        if msg[0] == "stop":
+            break
+
+        _, symbol, stale_since, started_at = msg
+        try:
+            stats, history = bars.read()
+            renderer.create_stock_layout(symbol, stats, history, stale_since)
+            frame.write(renderer.image)
+            frames_queue.put(("frame", symbol, started_at))
+        except Exception as e:
+            logger.error(f"Error rendering frame in worker: {str(e)}")
+    bars.close()
+    frame.close()
+
+class Pipeline:
+    """
+    Runs fetching and rendering in worker processes so the API and the panel
+    driver in the main process don't compete with pandas and matplotlib for the GIL.
+    Bars and frames travel through shared memory; the queues only carry small
+    control messages.
+    """
+    def __init__(self, symbol: str):
+        # fork: spawn would re-import main and with it the e-Paper driver in each worker
+        ctx = mp.get_context("fork")
+        self.symbol = symbol
+        self.bars = SharedBars(ctx.Lock())
+        self.frame = SharedFrame(ctx.Lock())
+        self.control = ctx.Queue()
+        self.bars_queue = ctx.Queue()
+        self.frames_queue = ctx.Queue()
+        self.workers = [
+            ctx.Process(target=fetch_worker, name="ticker-fetch", daemon=True,
+                        args=(self.bars, self.control, self.bars_queue, symbol)),
+            ctx.Process(target=render_worker, name="ticker-render", daemon=True,
+                        args=(self.bars, self.frame, self.bars_queue, self.frames_queue)),
+        ]
+
+    def start(self):
+        """Start the worker processes"""
+        for worker in self.workers:
+            worker.start()
+        logger.info(f"Started pipeline workers: {', '.join(f'{w.name} ({w.pid})' for w in self.workers)}")
+
+    def dead_workers(self) -> list:
+        """Names of worker processes that are no longer running"""
+        return [worker.name for worker in self.workers if not worker.is_alive()]
+
+    def set_symbol(self, symbol: str):
+        """Switch the fetch worker to a new symbol"""
+        self.symbol = symbol
+        self.control.put(("symbol", symbol))
+
+    def next_frame(self, timeout: float):
+        """Wait for the next rendered frame, returns (image, started_at) or None"""
+        try:
+            _, symbol, started_at = self.frames_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if symbol != self.symbol:
+            return None  # Rendered before a symbol change, drop it
+        return self.frame.read(), started_at
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        self.control.put(("stop",))
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.bars.close(unlink=True)
+        self.frame.close(unlink=True)
+        logger.info("Pipeline workers stopped")
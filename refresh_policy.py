@@ -0,0 +1,60 @@
+from PIL import ImageChops
+
+# Refresh modes supported by the 2.13inch V4 panel
+FULL = "full"        # Full waveform, flashes the panel and clears ghosting
+FAST = "fast"        # Fast full-screen waveform, less flashing
+PARTIAL = "partial"  # Partial waveform, no flashing but accumulates ghosting
+SKIP = "skip"        # Frame is identical to what is on the panel
+
+class RefreshPolicy:
+    """
+    Picks the refresh mode for each frame and keeps per-mode statistics.
+    Small changes use a partial refresh, larger ones a fast refresh, and a full
+    refresh is forced after too many partial or fast refreshes, as both leave
+    ghosting behind.
+    """
+    def __init__(self, max_between_full=30, partial_max_change=0.10):
+        self.max_between_full = max_between_full
+        self.partial_max_change = partial_max_change
+        self.refreshes_since_full = 0
+        self.stats = {mode: {"count": 0, "total_time": 0.0, "last_time": 0.0}
+                      for mode in (FULL, FAST, PARTIAL, SKIP)}
+
+    def changed_fraction(self, previous, current) -> float:
+        """Fraction of pixels that differ between two 1-bit frames"""
+        diff = ImageChops.logical_xor(previous.convert('1'), current.convert('1'))
+        if diff.getbbox() is None:
+            return 0.0
+        return diff.histogram()[255] / (diff.width * diff.height)
+
+    def choose(self, previous, current) -> str:
+        """Pick the refresh mode for the next frame given the one on the panel"""
+        if previous is None:
+            return FULL  # Unknown panel contents, start from a clean full refresh
+        changed = self.changed_fraction(previous, current)
+        if changed == 0.0:
+            return SKIP
+        if self.refreshes_since_full >= self.max_between_full:
+            return FULL
+        if changed <= self.partial_max_change:
+            return PARTIAL
+        return FAST
+
+    def record(self, mode: str, duration: float):
+        """Record a completed refresh"""
+        if mode == FULL:
+            self.refreshes_since_full = 0
+        elif mode in (PARTIAL, FAST):
+            self.refreshes_since_full += 1
+        entry = self.stats[mode]
+        entry["count"] += 1
+        entry["total_time"] += duration
+        entry["last_time"] = duration
+
+    def summary(self) -> str:
+        """One-line summary of refresh counts and average durations"""
+        parts = []
+        for mode, entry in self.stats.items():
+            avg = entry["total_time"] / entry["count"] if entry["count"] else 0.0
+            parts.append(f"{mode}={entry['count']} (avg {avg:.2f}s)")
+        return ", ".join(parts)
@@ -0,0 +1,111 @@
+import logging
+from PIL import Image, ImageDraw, ImageFont
+import matplotlib.pyplot as plt
+import io
+from datetime import datetime
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _format_value(value: float) -> str:
+    """Format a price-like value compactly for the indicator rows"""
+    return f"{value:.2f}" if value < 1000 else f"{value:,.0f}"
+
+class StockRenderer:
+    """
+    Draws the stock layout into a 1-bit image without touching any hardware.
+    EPaperDisplay, MockDisplay and the pipeline's render worker all draw with
+    this class so every mode produces the same frame.
+    """
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        
+        # Create initial image buffer (255 for white background)
+        self.image = Image.new('1', (self.width, self.height), 255)
+        self.draw = ImageDraw.Draw(self.image)
+        
+        # Load fonts
+        try:
+            self.price_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
+            self.symbol_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
+            self.small_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 11)
+        except OSError:
+            logger.warning("Custom fonts not found, using default font")
+            self.price_font = ImageFont.load_default()
+            self.symbol_font = ImageFont.load_default()
+            self.small_font = ImageFont.load_default()
+
+    def create_stock_layout(self, symbol: str, stats, graph_data=None, stale_since=None):
+        """Create the stock display layout, flagging stale data when offline"""
+        # Clear the image buffer
+        self.draw.rectangle((0, 0, self.width, self.height), fill=255)
+        
+        # Draw symbol at top left
+        self.draw.text((5, 5), symbol, font=self.symbol_font, fill=0)
+
+        # Draw % change vs previous close next to the symbol
+        if stats.change_pct is not None:
+            change_x = 5 + self.draw.textlength(symbol, font=self.symbol_font) + 6
+            self.draw.text((change_x, 5), f"{stats.change_pct:+.2f}%", font=self.symbol_font, fill=0)
+
+        # Draw current price below symbol
+        price_text = f"${stats.current_price:.2f}" if stats.current_price < 1000 else f"${stats.current_price:,.0f}"
+        self.draw.text((5, 30), price_text, font=self.price_font, fill=0)
+
+        # Draw high/low stats on top right
+        stats_x = self.width - 80
+        self.draw.text((stats_x, 5), f"H: ${stats.day_high:.2f}", font=self.symbol_font, fill=0)
+        self.draw.text((stats_x, 20), f"L: ${stats.day_low:.2f}", font=self.symbol_font, fill=0)
+
+        # Show how old the cached data is while offline
+        if stale_since is not None:
+            age_min = int((datetime.now() - stale_since).total_seconds() // 60)
+            age_text = f"{age_min}m" if age_min < 60 else f"{age_min // 60}h"
+            self.draw.text((stats_x, 38), f"OFF {age_text}", font=self.symbol_font, fill=0)
+        else:
+            # Indicator rows, right-aligned under the high/low stats
+            rows = []
+            if stats.vwap is not None:
+                rows.append(f"VWAP {_format_value(stats.vwap)}")
+            if stats.ma_short is not None and stats.ma_long is not None:
+                rows.append(f"MA {_format_value(stats.ma_short)}/{_format_value(stats.ma_long)}")
+            for i, text in enumerate(rows):
+                text_x = self.width - self.draw.textlength(text, font=self.small_font) - 3
+                self.draw.text((text_x, 36 + i * 11), text, font=self.small_font, fill=0)
+
+        # Add graph if data is provided
+        if graph_data is not None:
+            graph_image = self._create_graph(graph_data)
+            self.image.paste(graph_image, (0, 60))
+
+    def _create_graph(self, data):
+        """Create a price history graph"""
+        # Create a new figure with the correct size for the display
+        graph_height = self.height - 60  # Leave space for text above
+        dpi = 100
+        fig_width = self.width / dpi
+        fig_height = graph_height / dpi
+        
+        plt.figure(figsize=(fig_width, fig_height), dpi=dpi)
+        plt.plot(data, color='black', linewidth=1)
+        plt.axis('off')  # Hide axes
+        
+        # Set margins to 0 to use full space
+        plt.margins(0)
+        plt.tight_layout(pad=0)
+        
+        # Convert plot to PIL Image
+        buf = io.BytesIO()
+        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
+        plt.close()
+        buf.seek(0)
+        graph_image = Image.open(buf).convert('L')  # Convert to grayscale
+        
+        # Resize to fit the display
+        graph_image = graph_image.resize((self.width, graph_height))
+        
+        # Convert to black and white (1-bit)
+        graph_image = graph_image.point(lambda x: 0 if x < 128 else 255, '1')
+        
+        return graph_image
@@ -0,0 +1,178 @@
+import bisect
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+from dataclasses import asdict
+from datetime import datetime, timedelta
+import pandas as pd
+from data_fetcher import StockStats
+
+logger = logging.getLogger(__name__)
+
+class Recorder:
+    """
+    Wraps a DataFetcher and writes every quote and history frame it returns
+    to a gzip-compressed JSON lines file, one record per line:
+
+        {"t": <epoch>, "type": "quote", "symbol": ..., "stats": {...}, "offline": <bool>, "updated": <epoch>}
+        {"t": <epoch>, "type": "history", "symbol": ..., "t0": <epoch>, "dt": [...], "close": [...]}
+
+    "offline" is the fetcher's offline state after the call and "updated" the time
+    of the last successful fetch, so cached fallback quotes replay as stale.
+    History timestamps are delta-encoded (mostly 60s steps) to keep files small.
+    Each run writes its own file next to `path` (see run_path), so a run that is
+    killed before closing its file can't damage earlier recordings.
+    Every other attribute is passed through to the wrapped fetcher.
+    """
+    def __init__(self, fetcher, path: str):
+        self.fetcher = fetcher
+        self.path = run_path(path)
+        self.file = gzip.open(self.path, 'wt', encoding='utf-8')
+        logger.info(f"Recording fetched data to {self.path}")
+
+    def __getattr__(self, name):
+        return getattr(self.fetcher, name)
+
+    def _write(self, record: dict):
+        self.file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self.file.flush()  # Keep the file readable if the process is killed
+
+    def get_stock_data(self, symbol: str) -> StockStats:
+        stats = self.fetcher.get_stock_data(symbol)
+        updated = self.fetcher.last_updated(symbol)
+        self._write({
+            "t": time.time(),
+            "type": "quote",
+            "symbol": symbol,
+            "stats": asdict(stats),
+            "offline": self.fetcher.offline,
+            "updated": updated.timestamp() if updated is not None else None,
+        })
+        return stats
+
+    def get_historical_data(self, symbol: str) -> pd.DataFrame:
+        df = self.fetcher.get_historical_data(symbol)
+        epoch = pd.Timestamp(0, tz=df.index.tz)
+        stamps = [int(ts) for ts in (df.index - epoch) // pd.Timedelta(seconds=1)]
+        self._write({
+            "t": time.time(),
+            "type": "history",
+            "symbol": symbol,
+            "t0": stamps[0] if stamps else 0,
+            "dt": [b - a for a, b in zip(stamps, stamps[1:])],
+            "close": [round(float(c), 4) for c in df['Close'].to_numpy().ravel()],
+        })
+        return df
+
+    def close(self):
+        self.file.close()
+
+def run_path(path: str) -> str:
+    """Per-run file name for a RECORD_FILE path, e.g. recording-20261019-120000-1234.jsonl.gz"""
+    directory, name = os.path.split(path)
+    stem, dot, ext = name.partition('.')
+    return os.path.join(directory, f"{stem}-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}{dot}{ext}")
+
+def load_recording(paths: list) -> list:
+    """Read and merge the records of several recording files in time order.
+
+    A file from a run that was killed before closing it has no gzip trailer;
+    everything flushed up to that point is still used.
+    """
+    records = []
+    for path in paths:
+        count = len(records)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    records.append(json.loads(line))
+        except (EOFError, gzip.BadGzipFile, zlib.error, json.JSONDecodeError) as e:
+            logger.warning(f"Recording {path} was not closed cleanly ({e}), using {len(records) - count} records")
+    records.sort(key=lambda r: r["t"])
+    return records
+
+class ReplayDataFetcher:
+    """
+    A DataFetcher stand-in that plays a recording back at `speed` times real
+    time. Calls return the last record at or before the simulated time, so the
+    display loop sees the same quotes and frames it saw when recording. The
+    recording's symbols are used regardless of the symbol asked for. Recorded
+    offline periods replay as offline, with staleness measured in simulated
+    time. With loop=True playback wraps around, allowing a short recording to
+    drive a long simulated run.
+    """
+    def __init__(self, paths: list, speed: float = 1.0, loop: bool = True):
+        records = load_recording(paths)
+        self.quotes = [r for r in records if r["type"] == "quote"]
+        self.histories = [r for r in records if r["type"] == "history"]
+        if not self.quotes or not self.histories:
+            raise ValueError(f"Recordings {', '.join(paths)} need at least one quote and one history record")
+        self.quote_times = [r["t"] for r in self.quotes]
+        self.history_times = [r["t"] for r in self.histories]
+        self.start_time = min(self.quote_times[0], self.history_times[0])
+        self.span = max(self.quote_times[-1], self.history_times[-1]) - self.start_time
+        self.speed = speed
+        self.loop = loop
+        self.started_at = time.monotonic()
+        self.breaker = ReplayBreaker(self)
+        logger.info(f"Replaying {len(self.quotes)} quotes and {len(self.histories)} frames "
+                    f"spanning {self.span / 3600:.1f}h at {speed}x")
+
+    def simulated_seconds(self) -> float:
+        """Simulated time elapsed since playback started"""
+        return (time.monotonic() - self.started_at) * self.speed
+
+    def _position(self) -> float:
+        """Recording timestamp corresponding to the current simulated time"""
+        elapsed = self.simulated_seconds()
+        if self.loop and self.span > 0:
+            elapsed %= self.span
+        return self.start_time + min(elapsed, self.span)
+
+    def _current(self, records: list, times: list) -> dict:
+        index = bisect.bisect_right(times, self._position()) - 1
+        return records[max(index, 0)]
+
+    @property
+    def offline(self) -> bool:
+        return self._current(self.quotes, self.quote_times).get("offline", False)
+
+    def last_updated(self, symbol: str):
+        """Last successful fetch, shifted so its age matches the simulated time"""
+        record = self._current(self.quotes, self.quote_times)
+        updated = record.get("updated") or record["t"]
+        age = max(0.0, self._position() - updated)
+        return datetime.now() - timedelta(seconds=age)
+
+    def seconds_until_next_quote(self) -> float:
+        """Real seconds until playback reaches the next quote record"""
+        index = bisect.bisect_right(self.quote_times, self._position())
+        if index >= len(self.quote_times):
+            return 0.0
+        return (self.quote_times[index] - self._position()) / self.speed
+
+    def get_stock_data(self, symbol: str) -> StockStats:
+        return StockStats(**self._current(self.quotes, self.quote_times)["stats"])
+
+    def get_historical_data(self, symbol: str) -> pd.DataFrame:
+        record = self._current(self.histories, self.history_times)
+        stamps = [record["t0"]]
+        for delta in record["dt"]:
+            stamps.append(stamps[-1] + delta)
+        index = pd.to_datetime(stamps[:len(record["close"])], unit='s')
+        return pd.DataFrame({'Close': record["close"]}, index=index)
+
+class ReplayBreaker:
+    """Stands in for the circuit breaker: the next probe is the next recorded quote"""
+    def __init__(self, replay: ReplayDataFetcher):
+        self.replay = replay
+
+    @property
+    def is_open(self) -> bool:
+        return self.replay.offline
+
+    def seconds_until_probe(self) -> float:
+        return self.replay.seconds_until_next_quote() if self.replay.offline else 0.0
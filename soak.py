@@ -0,0 +1,105 @@
+"""
+Accelerated soak test of the ticker loop.
+
+Replays recordings (made with config.RECORD_FILE) through
+StockDisplay.display_loop at N times real speed against the mock display,
+sampling cycle latency, RSS, open file descriptors and open matplotlib
+figures. Growth over the run points at leaks such as unclosed figures or
+unbounded caches.
+
+Usage:
+    python soak.py recording-*.jsonl.gz --speed 100 --days 7 --csv soak.csv
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import statistics
+import time
+import matplotlib.pyplot as plt
+import config
+from main import StockDisplay
+from mock_display import MockDisplay
+from replay import ReplayDataFetcher
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def open_fds() -> int:
+    """Number of open file descriptors of this process"""
+    return len(os.listdir("/proc/self/fd"))
+
+def take_sample(stock_display: StockDisplay, fetcher: ReplayDataFetcher, started_at: float) -> dict:
+    """Snapshot of resource usage and the cycle latencies since the last sample"""
+    latencies = sorted(stock_display.cycle_times)
+    stock_display.cycle_times.clear()
+    return {
+        "real_s": round(time.monotonic() - started_at, 1),
+        "simulated_h": round(fetcher.simulated_seconds() / 3600, 2),
+        "frames": stock_display.display.frames_rendered,
+        "cycle_p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else "",
+        "cycle_max_ms": round(latencies[-1] * 1000, 1) if latencies else "",
+        "rss_mb": round(rss_mb(), 1),
+        "fds": open_fds(),
+        "figures": len(plt.get_fignums()),
+    }
+
+async def soak(stock_display: StockDisplay, fetcher: ReplayDataFetcher, days: float, sample_every: float, writer):
+    """Run the display loop until `days` of simulated time have passed"""
+    started_at = time.monotonic()
+    loop_task = asyncio.create_task(stock_display.display_loop())
+    samples = []
+    while fetcher.simulated_seconds() < days * 86400:
+        await asyncio.sleep(sample_every)
+        if loop_task.done():
+            break  # Surface the loop's exception below
+        sample = take_sample(stock_display, fetcher, started_at)
+        samples.append(sample)
+        writer.writerow(sample)
+        print(", ".join(f"{k}={v}" for k, v in sample.items()), flush=True)
+    stock_display.running = False
+    await loop_task
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recording through the display loop at N× speed")
+    parser.add_argument("recordings", nargs="+", help="Files recorded with config.RECORD_FILE")
+    parser.add_argument("--speed", type=float, default=100, help="Simulated seconds per real second")
+    parser.add_argument("--days", type=float, default=7, help="Simulated days to run")
+    parser.add_argument("--sample-every", type=float, default=30, help="Real seconds between samples")
+    parser.add_argument("--csv", default="soak.csv", help="Where to write the samples")
+    args = parser.parse_args()
+
+    # Per-cycle logging would dominate a week-long run
+    logging.getLogger().setLevel(logging.WARNING)
+    for name in ("main", "data_fetcher", "mock_display", "replay"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    # Scale the loop intervals so the simulated schedule matches production
+    config.PRICE_UPDATE_INTERVAL /= args.speed
+    config.GRAPH_UPDATE_INTERVAL /= args.speed
+
+    fetcher = ReplayDataFetcher(args.recordings, speed=args.speed)
+    stock_display = StockDisplay(display=MockDisplay(save_images=False), data_fetcher=fetcher)
+
+    with open(args.csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["real_s", "simulated_h", "frames", "cycle_p50_ms",
+                                               "cycle_max_ms", "rss_mb", "fds", "figures"])
+        writer.writeheader()
+        samples = asyncio.run(soak(stock_display, fetcher, args.days, args.sample_every, writer))
+
+    if len(samples) < 2:
+        print("Not enough samples, run longer or sample more often")
+        return
+    first, last = samples[0], samples[-1]
+    print(f"Simulated {last['simulated_h']:.1f}h in {last['real_s']:.0f}s, {last['frames']} frames")
+    print(f"RSS: {first['rss_mb']} -> {last['rss_mb']} MB ({last['rss_mb'] - first['rss_mb']:+.1f})")
+    print(f"FDs: {first['fds']} -> {last['fds']}, open figures: {first['figures']} -> {last['figures']}")
+    print(f"Cycle p50: {first['cycle_p50_ms']} -> {last['cycle_p50_ms']} ms")
+
+if __name__ == "__main__":
+    main()